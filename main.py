@@ -1,9 +1,14 @@
 # GitHub: https://github.com/the-can-of-soup/modrinth_downloader
 
 from __future__ import annotations
-from typing import Callable, Any
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from collections import defaultdict
+from types import MappingProxyType
+from typing import Callable, Iterator, Any
 from datetime import datetime
 import traceback
+import threading
+import functools
 import platform
 import shutil
 import json
@@ -14,6 +19,8 @@ import os
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ModuleNotFoundError:
     print('REQUESTS MODULE NOT FOUND')
     print('Please run "py -m pip install requests" to fix this.')
@@ -21,6 +28,14 @@ except ModuleNotFoundError:
     input('Press ENTER to quit.')
     sys.exit()
 
+try: # optional, parses API responses faster than the json module
+    import orjson
+    json_loads: Callable[[bytes | str], Any] = orjson.loads
+    json_dumps: Callable[[Any], str] = lambda obj: orjson.dumps(obj).decode()
+except ModuleNotFoundError:
+    json_loads: Callable[[bytes | str], Any] = json.loads
+    json_dumps: Callable[[Any], str] = json.dumps
+
 # QUERY FORMAT
 #
 # Write your search string normally. For search filters, add a word that begins with "+" or "-"
@@ -67,17 +82,39 @@ except ModuleNotFoundError:
 
 SEARCH_URL: str = 'https://api.modrinth.com/v2/search'
 VERSIONS_URL: str = 'https://api.modrinth.com/v2/project/{project_id}/version'
+PREWARM_URLS: tuple[str, ...] = ('https://api.modrinth.com/', 'https://cdn.modrinth.com/') # hosts connected to at startup
 PAGE_SIZE: int = 20
+MAX_SEARCH_LIMIT: int = 100 # largest page the search API will return
 VERSIONS_PAGE_SIZE: int = 15
+VERSIONS_PREFETCH_COUNT: int = 3 # number of projects at the top of a results page whose versions are prefetched
+WORKER_COUNT: int = 10 # max background requests at once
+API_CACHE_SIZE: int = 256 # max API responses kept in memory
+API_CACHE_TTL: float = 300 # seconds before a cached API response is fetched again
+PROJECTS_CACHE_TTL: float = 3600 # same, for project lookups by ID (project metadata rarely changes)
 RECOMMENDED_TERMINAL_SIZE: tuple[int, int] = (140, 40)
 OUTPUT_DIRECTORY: str = 'downloads'
+DOWNLOAD_WORKERS: int = 6 # max files downloaded at once (the usual browser limit of connections per host)
+DOWNLOAD_CHUNK_SIZE: int = 1 << 18 # 256 KiB
+RANGED_DOWNLOAD_MIN_SIZE: int = 16 * 1024 ** 2 # files at least this big are downloaded in parts over several connections
+RANGED_DOWNLOAD_PARTS: int = 4 # max parts per file, when there are enough of the DOWNLOAD_WORKERS connections to go around
+PROGRESS_INTERVAL: float = 0.05 # seconds between download progress redraws
 LOADING_ANIMATION: list[str] = ['-', '\\', '|', '/']
-
-LOADERS: list[str] = ['bukkit', 'bungeecord', 'canvas', 'fabric', 'folia', 'forge', 'iris', 'liteloader', 'modloader',
+FILE_SIZE_UNITS: tuple[str, ...] = ('B', 'KiB', 'MiB', 'GiB', 'TiB')
+# Every column is padded by the format spec. IDs and types are also cut by it, while free-text fields and counts are cut
+# beforehand by truncate(..., add_whitespace=False), so they keep the "…" and a cut number can't pass for a smaller one.
+PROJECT_ROW_FORMAT: str = '{:<8.8} {:<30} {:<12.12} {:<20} ⤓{:<11} ♥{:<7} {}' # ID, name, type, author, downloads, follows, loaders
+VERSION_ROW_FORMAT: str = '{:<8.8} {:<7.7} {:<30} {:<11.11} ⤓{:<10} {:<30} {}' # ID, type, version, size, downloads, MC versions, loaders
+USER_AGENT: str = 'the-can-of-soup/modrinth_downloader (https://github.com/the-can-of-soup/modrinth_downloader)'
+REQUEST_TIMEOUT: tuple[float, float] = (3, 10) # (connect, read) in seconds
+RETRY_STATUSES: tuple[int, ...] = (429, 500, 502, 503, 504)
+API_HEADERS: dict[str, str] = {'Accept': 'application/json'} # sent with API requests only, not file downloads
+
+LOADERS: tuple[str, ...] = ('bukkit', 'bungeecord', 'canvas', 'fabric', 'folia', 'forge', 'iris', 'liteloader', 'modloader',
                       'neoforge', 'optifine', 'paper', 'purpur', 'quilt', 'rift', 'spigot', 'sponge', 'vanilla', # "vanilla" is a loader for shaders
-                      'velocity', 'waterfall']
-SORTING_RULES: list[str] = ['relevance', 'downloads', 'follows', 'newest', 'updated']
-ATTRIBUTES: dict[str, str] = {
+                      'velocity', 'waterfall')
+LOADERS_SET: frozenset[str] = frozenset(LOADERS)
+SORTING_RULES: tuple[str, ...] = ('relevance', 'downloads', 'follows', 'newest', 'updated')
+ATTRIBUTES: MappingProxyType[str, str] = MappingProxyType({
     '+mod': 'project_type:mod',
     '+resourcepack': 'project_type:resourcepack',
     '+rp': 'project_type:resourcepack',
@@ -100,19 +137,23 @@ ATTRIBUTES: dict[str, str] = {
     '-serversupported': 'server_side:unsupported',
     '+clientsupported': 'client_side!=unsupported',
     '-clientsupported': 'client_side:unsupported'
-}
-SPECIAL_ATTRIBUTES: dict[str, Callable[[str], str]] = {
+})
+SPECIAL_ATTRIBUTES: MappingProxyType[str, Callable[[str], str]] = MappingProxyType({
     '+v': lambda version: f'versions:{version}',
     '+t': lambda tag: f'categories:{tag}',
     '-t': lambda tag: f'categories!={tag}'
-}
-FACETS: list[list[str]] = [
-    ['mod', 'resourcepack', 'rp', 'datapack', 'dp', 'modpack', 'mp', 'plugin', 'shader'],
+})
+FACETS: tuple[tuple[str, ...], ...] = (
+    ('mod', 'resourcepack', 'rp', 'datapack', 'dp', 'modpack', 'mp', 'plugin', 'shader'),
     LOADERS,
-    ['server', 'client', 'serverside', 'clientside', 'serversupported', 'clientsupported'],
-    ['v'],
-    ['t']
-]
+    ('server', 'client', 'serverside', 'clientside', 'serversupported', 'clientsupported'),
+    ('v',),
+    ('t',)
+)
+# Maps each attribute and special attribute prefix (with its sign) to the index of its facet
+FILTER_TO_FACET: dict[str, int] = {search_filter: i for i, facet in enumerate(FACETS)
+                                   for search_filter in (*ATTRIBUTES, *SPECIAL_ATTRIBUTES) if search_filter[1:] in facet}
+HEADER: str = 'MODRINTH DOWNLOADER\n' + '-'*30 + '\n'
 SEARCH_EXPLANATION: str = '''
 For a more detailed explanation, go here: https://github.com/the-can-of-soup/modrinth_downloader
 
@@ -132,45 +173,70 @@ To change the sorting rule, type a word beginning with "/" in your search term.
 Valid rules: /relevance (default), /downloads, /follows, /newest, /updated
 '''
 
+# HTTP SESSION
+
+# A single session keeps connections to the API and CDN alive between requests, so paging through results and
+# downloading several files does not pay for a new TCP and TLS handshake every time. Rate limits and server hiccups
+# are retried with a short backoff, and the last response is returned (instead of raising) so its error message can
+# still be shown.
+SESSION: requests.Session = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20,
+                                      max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=RETRY_STATUSES,
+                                                        raise_on_status=False)))
+SESSION.headers['User-Agent'] = USER_AGENT
+
+# Shared thread pool for requests that run in the background or in parallel
+EXECUTOR: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=WORKER_COUNT)
+
+# API CACHE
+
+# Maps (URL, parameters) of an API request to (time it expires, response). Entries are kept in least-recently-used order.
+API_CACHE: dict[tuple, tuple[float, requests.Response]] = {}
+API_CACHE_LOCK: threading.Lock = threading.Lock()
+
 # CLASS & FUNCTION DEFINITIONS
 
 def truncate(text: str, width: int = 20, add_whitespace: bool = True) -> str:
-    if len(text) <= width:
-        if add_whitespace:
-            return text.ljust(width)
-        return text
-    return text[:width-1] + '…'
+    if len(text) > width:
+        return text[:width-1] + '…'
+    if add_whitespace:
+        return f'{text:<{width}}'
+    return text
 
 def capitalize(text: str) -> str:
     return text[0].upper() + text[1:]
 
-def get_facet_index(search_filter: str) -> int:
-    for i in range(len(FACETS)):
-        facet: list[str] = FACETS[i]
-        if search_filter[1:] in facet:
-            return i
-        if search_filter[1] in facet: # special attributes only check for first letter
-            return i
-    raise ValueError(f'Internal Error: Invalid search filter "{search_filter}"!')
+@functools.lru_cache(maxsize=64) # paging through a search encodes the same facets again
+def encode_facets(facets: tuple[tuple[str, ...], ...]) -> str:
+    # Filter values are almost always plain printable text that needs no escaping, so skip the general JSON encoder
+    for facet in facets:
+        for value in facet:
+            if '"' in value or '\\' in value or not value.isprintable():
+                return json_dumps(facets)
+    return '[' + ','.join(['[' + ','.join([f'"{value}"' for value in facet]) + ']' for facet in facets]) + ']'
 
 def clear_screen() -> None:
     if platform.system() == 'Windows':
         os.system('cls')
     else:
-        os.system('clear')
+        # Clear screen and scrollback and move the cursor home, without spawning a "clear" process every redraw
+        sys.stdout.write('\x1b[2J\x1b[3J\x1b[H')
+        sys.stdout.flush()
 
 def format_file_size(size: int) -> str:
-    units: list[int] = [1024 ** i for i in range(5)]
-    unit_names: list[str] = ['B', 'KiB', 'MiB', 'GiB', 'TiB']
-    for i in range(len(units)):
-        if size < units[i] * 1024:
-            return f'{size/units[i]:.2f} {unit_names[i]}'
-    return f'{size//units[-1]:,} {unit_names[-1]}'
+    unit_index: int = max(0, (size.bit_length() - 1) // 10) # each unit is 2^10 times the previous one
+    if unit_index < len(FILE_SIZE_UNITS):
+        return f'{size / (1 << (10 * unit_index)):.2f} {FILE_SIZE_UNITS[unit_index]}'
+    return f'{size >> (10 * (len(FILE_SIZE_UNITS) - 1)):,} {FILE_SIZE_UNITS[-1]}'
 
 class Project:
+    __slots__ = ('project_id', 'slug', 'project_type', 'name', 'author', 'description', 'downloads', 'follows',
+                 'categories', 'mc_versions', '_date_created', '_date_modified', 'project_license', 'client_support',
+                 'server_support', 'loaders', 'tags', '_loaders_display', '_tags_display', '_row')
+
     def __init__(self, project_id: str, slug: str, project_type: str, name: str, author: str, description: str,
-    downloads: int, follows: int, categories: list[str], mc_versions: list[str], date_created: datetime,
-    date_modified: datetime, project_license: str, client_support: str, server_support: str):
+    downloads: int, follows: int, categories: list[str], mc_versions: list[str], date_created: datetime | str,
+    date_modified: datetime | str, project_license: str, client_support: str, server_support: str):
         self.project_id: str = project_id
         self.slug: str = slug
         self.project_type: str = project_type
@@ -181,29 +247,47 @@ class Project:
         self.follows: int = follows
         self.categories: list[str] = categories
         self.mc_versions: list[str] = mc_versions
-        self.date_created: datetime = date_created
-        self.date_modified: datetime = date_modified
+        self._date_created: datetime | str = date_created # ISO strings are parsed on first access
+        self._date_modified: datetime | str = date_modified
         self.project_license: str = project_license
         self.client_support: str = client_support
         self.server_support: str = server_support
 
-        self.loaders: list[str] = list(filter(lambda category: category in LOADERS, self.categories))
-        self.tags: list[str] = list(filter(lambda category: category not in LOADERS, self.categories))
+        # Split categories into loaders and tags
+        self.loaders: list[str] = []
+        self.tags: list[str] = []
+        for category in self.categories:
+            if category in LOADERS_SET:
+                self.loaders.append(category)
+            else:
+                self.tags.append(category)
+        self._loaders_display: str = ' '.join(map(capitalize, self.loaders))
+        self._tags_display: str = ' '.join(map(capitalize, self.tags))
+
+        # Render the results row once, since nothing in it changes after construction
+        self._row: str = PROJECT_ROW_FORMAT.format(self.project_id, truncate(self.name, 30, False), capitalize(self.project_type),
+                                                   truncate(self.author, 20, False), truncate(f'{self.downloads:,}', 11, False),
+                                                   truncate(f'{self.follows:,}', 7, False),
+                                                   truncate(self._loaders_display, 50, False))
+
+    @property
+    def date_created(self) -> datetime:
+        if isinstance(self._date_created, str):
+            self._date_created = datetime.fromisoformat(self._date_created)
+        return self._date_created
+
+    @property
+    def date_modified(self) -> datetime:
+        if isinstance(self._date_modified, str):
+            self._date_modified = datetime.fromisoformat(self._date_modified)
+        return self._date_modified
 
     def __repr__(self) -> str:
         out: str = f'Project({repr(self.project_id)}, {repr(self.slug)}, {repr(self.project_type)}, {repr(self.name)}, …)'
         return out
 
     def __str__(self) -> str:
-        out: str = truncate(self.project_id, 8) # Project ID
-        out += f' {truncate(self.name, 30)}' # Name
-        out += f' {truncate(capitalize(self.project_type), 12)}' # Project type
-        out += f' {truncate(self.author, 20)}' # Author
-        out += f' ⤓{truncate(f"{self.downloads:,}", 11)}' # Downloads
-        out += f' ♥{truncate(f"{self.follows:,}", 7)}' # Follows
-        out += f' {truncate(" ".join([capitalize(i) for i in self.loaders]), 50, False)}' # Loaders
-
-        return out
+        return self._row
 
     def print(self) -> None:
         print(f'"{self.name}" ({self.project_type}) by {self.author}    ⤓{self.downloads:,} ♥{self.follows:,}')
@@ -214,18 +298,24 @@ class Project:
         print(f'Date Created, Modified: {self.date_created.ctime()}, {self.date_modified.ctime()}')
         print(f'Client, Server Support: {self.client_support}, {self.server_support}')
         print(f'License: {self.project_license}')
-        print('Loaders: ' + ' '.join([capitalize(i) for i in self.loaders]))
-        print('Tags: ' + ' '.join([capitalize(i) for i in self.tags]))
+        print(f'Loaders: {self._loaders_display}')
+        print(f'Tags: {self._tags_display}')
         print('MC Versions: ' + ' '.join(list(reversed(self.mc_versions))[:10]) + ('…' if len(self.mc_versions) > 10 else ''))
 
     @staticmethod
     def from_json(data: dict) -> Project:
         return Project(data['project_id'], data['slug'], data['project_type'], data['title'], data['author'],
-                       data['description'], data['downloads'], data['follows'], data['categories'], data['versions'],
-                       datetime.fromisoformat(data['date_created']), datetime.fromisoformat(data['date_modified']),
+                       data['description'], data['downloads'], data['follows'],
+                       list(map(sys.intern, data['categories'])), # categories repeat across hits, so share one copy of each
+                       data['versions'],
+                       data['date_created'], data['date_modified'],
                        data['license'], data['client_side'], data['server_side'])
 
 class Version:
+    __slots__ = ('version_id', 'version_type', 'version_level', 'version_number', 'name', 'downloads', 'mc_versions',
+                 'loaders', 'files', 'dependency_ids', 'optional_dependency_ids', 'dependencies', 'optional_dependencies',
+                 'project_id', 'primary_file', '_mc_versions_display', '_loaders_display', '_row')
+
     def __init__(self, version_id: str, version_type: str, version_number: str, name: str, downloads: int,
                  mc_versions: list[str], loaders: list[str], files: list[VersionFile], dependency_ids: list[str],
                  optional_dependency_ids: list[str], project_id: str):
@@ -256,35 +346,26 @@ class Version:
 
         self.primary_file: VersionFile = self.files[0]
 
+        self._mc_versions_display: str = ' '.join(map(capitalize, self.mc_versions))
+        self._loaders_display: str = ' '.join(map(capitalize, self.loaders))
+        self._row: str | None = None # rendered by __str__ on first use
+
     def __repr__(self) -> str:
         return f'Version({repr(self.version_id)}, {repr(self.version_type)}, {repr(self.version_number)}, {repr(self.name)}, …)'
 
     def __str__(self) -> str:
-        out: str = truncate(self.version_id, 8) # Version ID
-        out += f' {truncate(self.version_type, 7)}' # Version type
-        out += f' {truncate(self.version_number, 30)}' # Version number
-        out += f' {truncate(format_file_size(self.primary_file.size), 11)}'
-        out += f' ⤓{truncate(f"{self.downloads:,}", 10)}' # Downloads
-        out += f' {truncate(" ".join([capitalize(i) for i in self.mc_versions]), 30)}' # MC Versions
-        out += f' {truncate(" ".join([capitalize(i) for i in self.loaders]), 40, False)}' # Loaders
-
-        return out
+        if self._row is None:
+            self._row = VERSION_ROW_FORMAT.format(self.version_id, self.version_type, truncate(self.version_number, 30, False),
+                                                  format_file_size(self.primary_file.size), truncate(f'{self.downloads:,}', 10, False),
+                                                  truncate(self._mc_versions_display, 30, False),
+                                                  truncate(self._loaders_display, 40, False))
+        return self._row
 
     def get_dependency_info(self) -> tuple[list[Project],list[Project]]:
-        self.dependencies = []
-        for dependency_id in self.dependency_ids:
-            facets_param: list[list[str]] = [[f'project_id:{dependency_id}']]
-            r: requests.Response = requests.get(SEARCH_URL, params={'facets': json.dumps(facets_param)})
-            r.raise_for_status()
-            data: dict = r.json()
-            self.dependencies.append(Project.from_json(data['hits'][0]))
-        self.optional_dependencies = []
-        for dependency_id in self.optional_dependency_ids:
-            facets_param: list[list[str]] = [[f'project_id:{dependency_id}']]
-            r: requests.Response = requests.get(SEARCH_URL, params={'facets': json.dumps(facets_param)})
-            r.raise_for_status()
-            data: dict = r.json()
-            self.optional_dependencies.append(Project.from_json(data['hits'][0]))
+        # Fetch required and optional dependencies at the same time
+        dependencies_future: Future[list[Project]] = EXECUTOR.submit(get_projects, self.dependency_ids)
+        self.optional_dependencies = get_projects(self.optional_dependency_ids)
+        self.dependencies = dependencies_future.result()
         return self.dependencies, self.optional_dependencies
 
     @staticmethod
@@ -297,6 +378,8 @@ class Version:
                        data['project_id'])
 
 class VersionFile:
+    __slots__ = ('url', 'filename', 'size', 'primary')
+
     def __init__(self, url: str, filename: str, size: int, primary: bool):
         self.url: str = url
         self.filename: str = os.path.split(filename)[-1]
@@ -314,6 +397,9 @@ class VersionFile:
         return VersionFile(data['url'], data['filename'], data['size'], data['primary'])
 
 class SearchResults:
+    __slots__ = ('projects', 'page_number', 'page_count', 'total_hits', 'response_time', 'query', 'next_page',
+                 'prefetched_versions')
+
     def __init__(self, projects: list[Project], page_number: int, page_count: int, total_hits: int, response_time: float,
                  query: str):
         self.projects: list[Project] = projects
@@ -322,6 +408,8 @@ class SearchResults:
         self.total_hits: int = total_hits
         self.response_time: float = response_time
         self.query: str = query
+        self.next_page: Future[SearchResults | SearchResultsError] | None = None # prefetched by the results page
+        self.prefetched_versions: dict[str, Future[VersionsSearchResults | SearchResultsError]] = {} # by project ID
 
     def __repr__(self) -> str:
         return f'SearchResults([{len(self.projects)} projects], {self.page_number}, {self.page_count}, {self.total_hits}, {self.response_time}, {repr(self.query)})'
@@ -330,20 +418,22 @@ class SearchResults:
         return f'{self.total_hits} results'
 
     def print(self) -> None:
+        # Build the whole page and print it in one write
         # Header
-        print(f'Query: "{self.query}"')
-        print('')
-        print('[#]  ID       NAME                           TYPE         AUTHOR               DOWNLOADS    FOLLOWS  LOADERS')
+        lines: list[str] = [f'Query: "{self.query}"', '',
+                            '[#]  ID       NAME                           TYPE         AUTHOR               DOWNLOADS    FOLLOWS  LOADERS']
 
         # Body
         for i in range(len(self.projects)):
-            project: Project = self.projects[i]
-            print(f'{truncate("["+str(i)+"]", 4)} {project}')
+            lines.append(f'{f"[{i}]":<4} {self.projects[i]}')
 
         # Footer
-        print(f'Page {self.page_number+1}/{self.page_count} @ {PAGE_SIZE} items/page - {self.total_hits} results - Fetched in {int(self.response_time*1000):,}ms')
+        lines.append(f'Page {self.page_number+1}/{self.page_count} @ {PAGE_SIZE} items/page - {self.total_hits} results - Fetched in {int(self.response_time*1000):,}ms')
+        print('\n'.join(lines))
 
 class VersionsSearchResults:
+    __slots__ = ('versions', 'page_number', 'page_count', 'total_hits', 'response_time', 'project')
+
     def __init__(self, versions: list[Version], page_number: int, page_count: int, total_hits: int, response_time: float,
                  project: Project):
         self.versions: list[Version] = versions
@@ -366,20 +456,23 @@ class VersionsSearchResults:
         return min(len(self.versions), (self.page_number + 1) * VERSIONS_PAGE_SIZE)
 
     def print(self) -> None:
+        # Build the whole page and print it in one write
         # Header
-        print('[#]  ID       TYPE    VERSION                        SIZE        DOWNLOADS   MC VERSIONS                    LOADERS')
+        lines: list[str] = ['[#]  ID       TYPE    VERSION                        SIZE        DOWNLOADS   MC VERSIONS                    LOADERS']
 
         # Body
         j: int = 0
         for i in range(self.start_index(), self.end_index()):
-            version: Version = self.versions[i]
-            print(f'{truncate("["+str(j)+"]", 4)} {version}')
+            lines.append(f'{f"[{j}]":<4} {self.versions[i]}')
             j += 1
 
         # Footer
-        print(f'Page {self.page_number+1}/{self.page_count} @ {VERSIONS_PAGE_SIZE} items/page - {self.total_hits} results - Fetched in {int(self.response_time*1000):,}ms')
+        lines.append(f'Page {self.page_number+1}/{self.page_count} @ {VERSIONS_PAGE_SIZE} items/page - {self.total_hits} results - Fetched in {int(self.response_time*1000):,}ms')
+        print('\n'.join(lines))
 
 class SearchResultsError:
+    __slots__ = ('message',)
+
     def __init__(self, message: str):
         self.message: str = message
 
@@ -393,6 +486,199 @@ class SearchResultsError:
         print(f'AN ERROR OCCURRED:\n')
         print(f'{"="*40}\n{self.message}{"="*40}')
 
+def cached_get(url: str, params: dict[str, Any] | None = None, ttl: float = API_CACHE_TTL) -> requests.Response:
+    # GET an API URL, reusing the response to the same request if it was fetched less than ttl seconds ago
+    cache_key: tuple = (url, tuple(sorted((params or {}).items())))
+    with API_CACHE_LOCK:
+        cached: tuple[float, requests.Response] | None = API_CACHE.pop(cache_key, None)
+        if cached is not None and time.monotonic() < cached[0]:
+            API_CACHE[cache_key] = cached # move to the end as the most recently used
+            return cached[1]
+
+    r: requests.Response = SESSION.get(url, params=params, headers=API_HEADERS, timeout=REQUEST_TIMEOUT)
+
+    # Cache successful responses only
+    if r.ok:
+        with API_CACHE_LOCK:
+            API_CACHE[cache_key] = (time.monotonic() + ttl, r)
+            while len(API_CACHE) > API_CACHE_SIZE:
+                del API_CACHE[next(iter(API_CACHE))] # evict the least recently used response
+    return r
+
+class DownloadProgress:
+    __slots__ = ('downloaded_bytes', 'total_bytes', 'lock', 'cancelled', '_total_display')
+
+    def __init__(self, total_bytes: int):
+        self.downloaded_bytes: int = 0
+        self.total_bytes: int = total_bytes
+        self.lock: threading.Lock = threading.Lock() # downloads may run on several threads at once
+        self.cancelled: bool = False # set to stop every download sharing this progress at its next chunk
+        self._total_display: str = format_file_size(total_bytes) # formatted once instead of on every redraw
+
+    def __repr__(self) -> str:
+        return f'DownloadProgress({self.downloaded_bytes}, {self.total_bytes})'
+
+    def __str__(self) -> str:
+        return f'{format_file_size(self.downloaded_bytes)}/{self._total_display}'
+
+    def add(self, byte_count: int) -> None:
+        with self.lock:
+            self.downloaded_bytes += byte_count
+
+    def correct_total(self, expected_size: int, actual_size: int) -> None:
+        # Replace a file's expected size with its real size once it is known
+        if actual_size == expected_size:
+            return
+        with self.lock:
+            self.total_bytes += actual_size - expected_size
+            self._total_display = format_file_size(self.total_bytes)
+
+class ProgressReader:
+    # File-like wrapper around a response body that counts the bytes read into a DownloadProgress,
+    # so shutil.copyfileobj can do the copy loop without a Python generator in between
+    __slots__ = ('raw', 'progress')
+
+    def __init__(self, raw: Any, progress: DownloadProgress):
+        self.raw: Any = raw
+        self.progress: DownloadProgress = progress
+
+    def __repr__(self) -> str:
+        return f'ProgressReader({repr(self.raw)}, {repr(self.progress)})'
+
+    def read(self, size: int = -1) -> bytes:
+        if self.progress.cancelled:
+            raise InterruptedError('Download cancelled')
+        data: bytes = self.raw.read(size)
+        self.progress.add(len(data))
+        return data
+
+def preallocate_file(f: Any, size: int) -> None:
+    # Reserve a file's disk space in one call where the OS supports it, instead of block by block as it is written
+    if size > 0 and hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+        except OSError:
+            pass # not every filesystem supports it, and the download works without it
+
+def range_headers(start: int, end: int) -> dict[str, str]:
+    # Byte offsets only line up with the file if the server does not compress the response
+    return {'Range': f'bytes={start}-{end}', 'Accept-Encoding': 'identity'}
+
+def download_range(url: str, local_filename: str, start: int, end: int, progress: DownloadProgress,
+                   r: requests.Response | None = None) -> None:
+    # Download bytes start-end (inclusive) of a file into the same place in an existing local file
+    if r is None:
+        r = SESSION.get(url, headers=range_headers(start, end), stream=True, timeout=REQUEST_TIMEOUT)
+    with r:
+        if r.status_code != 206:
+            raise requests.HTTPError(f'Expected a partial response for bytes {start}-{end}, got {r.status_code}', response=r)
+        if not r.headers.get('Content-Range', '').startswith(f'bytes {start}-{end}/'):
+            raise requests.HTTPError(f'Expected bytes {start}-{end}, got {r.headers.get("Content-Range")}', response=r)
+        with open(local_filename, 'r+b') as f: # each part has its own file handle, so no seek/write locking is needed
+            f.seek(start)
+            r.raw.decode_content = True # undo any transfer compression like iter_content would
+            shutil.copyfileobj(ProgressReader(r.raw, progress), f, DOWNLOAD_CHUNK_SIZE)
+            # The file was sized up front, so a short body would otherwise leave a silent gap of zeros
+            if f.tell() - start != end - start + 1:
+                raise requests.HTTPError(f'Got {f.tell() - start} of {end - start + 1} bytes for bytes {start}-{end}', response=r)
+
+def download_file_ranged(url: str, local_filename: str, size: int, parts: int, progress: DownloadProgress) -> bool:
+    # Download a big file in several parts at once, which is faster than one connection for few, big files.
+    # Returns False without downloading anything if the server does not support ranges for this file.
+    part_size: int = math.ceil(size / parts)
+    ranges: list[tuple[int, int]] = [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+
+    # Request the first part now to check that ranges are supported and the size is right
+    r: requests.Response = SESSION.get(url, headers=range_headers(*ranges[0]), stream=True, timeout=REQUEST_TIMEOUT)
+    if r.status_code != 206 or r.headers.get('Content-Range', '').split('/')[-1] != str(size):
+        r.close()
+        return False
+
+    # noinspection PyBroadException
+    try:
+        with open(local_filename, 'wb') as f:
+            preallocate_file(f, size)
+            f.truncate(size) # size the whole file so every part can be written in place
+    except:
+        r.close()
+        raise
+    executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=len(ranges))
+    # noinspection PyBroadException
+    try:
+        futures: list[Future[None]] = [executor.submit(download_range, url, local_filename, *ranges[0], progress, r)]
+        futures += [executor.submit(download_range, url, local_filename, start, end, progress) for start, end in ranges[1:]]
+        for future in futures:
+            future.result()
+    except:
+        executor.shutdown(wait=False, cancel_futures=True) # don't wait for the other parts when one fails
+        raise
+    executor.shutdown()
+    return True
+
+def download_file(url: str, local_filename: str, size: int, progress: DownloadProgress, parts: int = 1) -> None:
+    # parts is how many connections this file may use at once
+    if parts > 1 and size >= RANGED_DOWNLOAD_MIN_SIZE and download_file_ranged(url, local_filename, size, parts, progress):
+        return
+
+    with SESSION.get(url, stream=True, timeout=REQUEST_TIMEOUT) as r:
+        r.raise_for_status()
+        actual_size: int = int(r.headers.get('Content-Length', size))
+        progress.correct_total(size, actual_size) # trust the server if the metadata is off
+        r.raw.decode_content = True # undo any transfer compression like iter_content would
+        with open(local_filename, 'wb') as f:
+            preallocate_file(f, actual_size)
+            shutil.copyfileobj(ProgressReader(r.raw, progress), f, DOWNLOAD_CHUNK_SIZE)
+            f.truncate() # drop any preallocated space the body did not fill
+
+def download_files(files: list[VersionFile], directory: str) -> None:
+    # Download files in parallel and redraw the progress while waiting for them
+    progress: DownloadProgress = DownloadProgress(sum([file.size for file in files]))
+    parts: int = min(RANGED_DOWNLOAD_PARTS, DOWNLOAD_WORKERS // len(files)) # keep to DOWNLOAD_WORKERS connections in total
+    loading_animation_frame: int = 0
+    executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=min(DOWNLOAD_WORKERS, len(files)))
+    # noinspection PyBroadException
+    try:
+        futures: list[Future[None]] = [executor.submit(download_file, file.url, os.path.join(directory, file.filename), file.size,
+                                                       progress, parts)
+                                       for file in files]
+        unfinished: set[Future[None]] = set(futures)
+        while len(unfinished) > 0:
+            print(f'Downloading... {LOADING_ANIMATION[loading_animation_frame]} {progress}     ', end='\r')
+            loading_animation_frame = (loading_animation_frame + 1) % len(LOADING_ANIMATION)
+            unfinished = wait(unfinished, timeout=PROGRESS_INTERVAL).not_done
+    except:
+        # Ctrl-C: stop the running downloads at their next chunk instead of waiting for them to finish
+        progress.cancelled = True
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    for future in futures:
+        future.result() # raise the first error, if any download failed
+
+def run_in_background(function: Callable[..., Any], *args: Any) -> Future:
+    # Run a speculative task on a daemon thread, so quitting never has to wait for it like it would for EXECUTOR
+    future: Future = Future()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(function(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+def prewarm_connections() -> None:
+    # Connect to the API and CDN ahead of time, so the first search and download don't wait for DNS, TCP and TLS
+    for url in PREWARM_URLS:
+        # noinspection PyBroadException
+        try:
+            SESSION.head(url, timeout=REQUEST_TIMEOUT)
+        except:
+            pass # the real request will report any connection problem
+
 def search(query: str = '', page_number: int = 0) -> SearchResults | SearchResultsError:
     # noinspection PyBroadException
     try:
@@ -400,10 +686,17 @@ def search(query: str = '', page_number: int = 0) -> SearchResults | SearchResul
         start_time: float = time.time()
 
         # Separate search term from filters
-        words: list[str] = query.split(' ')
-        filters: list[str] = list(filter(lambda word: word.startswith('+') or word.startswith('-'), words))
-        sorting_rules: list[str] = list(filter(lambda word: word.startswith('/'), words))
-        search_term: str = ' '.join(list(filter(lambda word: (word not in filters) and (word not in sorting_rules), words)))
+        filters: list[str] = []
+        sorting_rules: list[str] = []
+        search_words: list[str] = []
+        for word in query.split(): # split() also collapses runs of whitespace
+            if word[0] in '+-':
+                filters.append(word)
+            elif word[0] == '/':
+                sorting_rules.append(word)
+            else:
+                search_words.append(word)
+        search_term: str = ' '.join(search_words)
 
         # Parse sorting rule (if any)
         if len(sorting_rules) > 1:
@@ -415,51 +708,49 @@ def search(query: str = '', page_number: int = 0) -> SearchResults | SearchResul
                 return SearchResultsError(f'Invalid sorting rule "{sorting_rule}"!\nValid rules: {", ".join(SORTING_RULES)}\n')
 
         # Parse search filters (see "facets" parameter in Modrinth API docs for more info: https://docs.modrinth.com/api/operations/searchprojects/)
-        facets_formatted: list[list[str]] = []
-        for _ in range(len(FACETS)):
-            facets_formatted.append([]) # Start with an empty OR expression for each facet
+        facets_formatted: defaultdict[int, list[str]] = defaultdict(list) # One OR expression per facet, created when first used
+        separate_facets: list[list[str]] = [] # Expressions that are ANDed with everything else on their own
 
         for search_filter in filters: # For each search filter
+            sign: str = search_filter[0] # "+" or "-"
             if search_filter in ATTRIBUTES: # If it is a normal attribute
                 attribute_formatted: str = ATTRIBUTES[search_filter] # Find the formatted version of the attribute
+                facet_index: int = FILTER_TO_FACET[search_filter] # Find the facet that the attribute belongs to
 
             else:
-                for special_attribute in SPECIAL_ATTRIBUTES:
-                    if search_filter.startswith(special_attribute): # If it is a special attribute
-                        attribute_formatted: str = SPECIAL_ATTRIBUTES[special_attribute](search_filter[2:]) # Apply special attribute function to find formatted version of the attribute
-                        break
-
-                else: # If it is not a valid attribute
+                special_attribute: Callable[[str], str] | None = SPECIAL_ATTRIBUTES.get(search_filter[:2]) # Special attributes are all 2 characters long
+                if special_attribute is None: # If it is not a valid attribute
                     return SearchResultsError(f'Invalid search filter "{search_filter}"!\n')
+                attribute_formatted: str = special_attribute(search_filter[2:]) # Apply special attribute function to find formatted version of the attribute
+                facet_index: int = FILTER_TO_FACET[search_filter[:2]]
 
-            # At this point, the attribute is valid and the formatted version has been found.
-            facet_index: int = get_facet_index(search_filter) # Find the facet that the attribute belongs to
-            if search_filter.startswith('+'):  # If it is a positive attribute
+            # At this point, the attribute is valid and the formatted version and facet have been found.
+            if sign == '+': # If it is a positive attribute
                 facets_formatted[facet_index].append(attribute_formatted) # OR it with the other positive attributes of its facet
             else: # If it is a negative attribute
-                facets_formatted.append([attribute_formatted]) # AND it with everything else
+                separate_facets.append([attribute_formatted]) # AND it with everything else
 
         # Check if search term is an ID search and add filter if it is
         if search_term.startswith('#'):
-            facets_formatted.append([f'project_id:{search_term[1:]}'])
+            separate_facets.append([f'project_id:{search_term[1:]}'])
             search_term = ''
 
-        # Remove empty facets
-        facets_formatted = list(filter(lambda facet_formatted: len(facet_formatted) > 0, facets_formatted))
+        # Combine and sort facets, so the same filters in a different order make the same request
+        facets_sorted: tuple[tuple[str, ...], ...] = tuple(sorted(tuple(sorted(facet_formatted)) for facet_formatted in [*facets_formatted.values(), *separate_facets]))
 
         # Format URL parameters
         offset: int = page_number * PAGE_SIZE
         params: dict[str, str] = {'query': search_term, 'offset': offset, 'limit': PAGE_SIZE}
         if sorting_rule is not None:
             params['index'] = sorting_rule
-        if len(facets_formatted) > 0:
-            params['facets'] = json.dumps(facets_formatted)
+        if len(facets_sorted) > 0:
+            params['facets'] = encode_facets(facets_sorted)
 
         # Send request and end timer
-        r: requests.Response = requests.get(SEARCH_URL, params=params)
+        r: requests.Response = cached_get(SEARCH_URL, params)
         end_time: float = time.time()
         response_time: float = end_time - start_time
-        data: dict = r.json()
+        data: dict = json_loads(r.content)
 
         # Check for error response
         if 'error' in data:
@@ -467,7 +758,7 @@ def search(query: str = '', page_number: int = 0) -> SearchResults | SearchResul
         r.raise_for_status()
 
         # Return results
-        projects: list[Project] = [Project.from_json(hit) for hit in data['hits']]
+        projects: list[Project] = list(map(Project.from_json, data['hits']))
         total_hits: int = data['total_hits']
         page_count: int = max(1, math.ceil(total_hits / PAGE_SIZE))
         results: SearchResults = SearchResults(projects, page_number, page_count, total_hits, response_time, query)
@@ -483,11 +774,11 @@ def get_versions(project: Project) -> VersionsSearchResults | SearchResultsError
         start_time: float = time.time()
 
         # Send request and end timer
-        r: requests.Response = requests.get(VERSIONS_URL.format(project_id=project.project_id))
+        r: requests.Response = cached_get(VERSIONS_URL.format(project_id=project.project_id), {'include_changelog': 'false'}) # changelogs are never shown
         r.raise_for_status()
         end_time: float = time.time()
         response_time: float = end_time - start_time
-        data: list = r.json()
+        data: list = json_loads(r.content)
 
         # Return results
         versions: list[Version] = list(map(Version.from_json, data))
@@ -499,6 +790,21 @@ def get_versions(project: Project) -> VersionsSearchResults | SearchResultsError
     except:
         return SearchResultsError(traceback.format_exc())
 
+def get_projects(project_ids: list[str]) -> list[Project]:
+    # Look up many projects with one search request per MAX_SEARCH_LIMIT IDs by ORing their IDs together.
+    # (The bulk /projects endpoint returns a different format without the author, so search is used instead.)
+    found: dict[str, Project] = {}
+    for i in range(0, len(project_ids), MAX_SEARCH_LIMIT):
+        batch: list[str] = project_ids[i:i+MAX_SEARCH_LIMIT]
+        facets_param: tuple[tuple[str, ...], ...] = (tuple([f'project_id:{project_id}' for project_id in batch]),)
+        r: requests.Response = cached_get(SEARCH_URL, {'facets': encode_facets(facets_param), 'limit': len(batch)},
+                                          PROJECTS_CACHE_TTL)
+        r.raise_for_status()
+        data: dict = json_loads(r.content)
+        for hit in data['hits']:
+            found[hit['project_id']] = Project.from_json(hit)
+    return [found[project_id] for project_id in project_ids] # keep the requested order
+
 # MAIN
 
 if __name__ == '__main__':
@@ -512,21 +818,23 @@ if __name__ == '__main__':
     # ['quit']
     page: list[Any] = ['search']
 
+    # Open connections in the background while the user types their first search
+    threading.Thread(target=prewarm_connections, daemon=True).start() # daemon, so quitting never waits for it
+
     # Mainloop
     while True:
         clear_screen()
-        print('MODRINTH DOWNLOADER')
-        print('-'*30)
-        print('')
-        terminal_size: os.terminal_size = shutil.get_terminal_size()
+        print(HEADER)
 
         new_search: tuple[str, int] | None = None
+        new_search_future: Future[SearchResults | SearchResultsError] | None = None # already running new_search
 
         # Search page
         if page[0] == 'search':
             print('SEARCH')
             print(SEARCH_EXPLANATION)
             print('')
+            terminal_size: os.terminal_size = shutil.get_terminal_size() # only needed here, so only checked here
             if terminal_size.columns < RECOMMENDED_TERMINAL_SIZE[0] or terminal_size.lines < RECOMMENDED_TERMINAL_SIZE[1]:
                 print(f'! WARNING: A terminal size of at least {RECOMMENDED_TERMINAL_SIZE[0]}x{RECOMMENDED_TERMINAL_SIZE[1]} is recommended. Current size: {terminal_size.columns}x{terminal_size.lines}')
                 print('')
@@ -544,6 +852,16 @@ if __name__ == '__main__':
             print('')
             page[1].print()
             print('')
+
+            # Start loading the next page while the user reads this one
+            if page[1].next_page is None and page[1].page_count > 1:
+                page[1].next_page = run_in_background(search, page[1].query, (page[1].page_number + 1) % page[1].page_count)
+
+            # Also start loading the versions of the top projects, since those are the most likely to be opened
+            for project in page[1].projects[:VERSIONS_PREFETCH_COUNT]:
+                if project.project_id not in page[1].prefetched_versions:
+                    page[1].prefetched_versions[project.project_id] = run_in_background(get_versions, project)
+
             print('Enter a number to view/download that project number.')
             print('Enter "<" or ">" to change page, or "p<number>" to jump to a page.')
             print('Enter "Q" to go back to search.')
@@ -561,6 +879,7 @@ if __name__ == '__main__':
             # Next page
             elif action == '>':
                 new_search = (page[1].query, (page[1].page_number + 1) % page[1].page_count)
+                new_search_future = page[1].next_page
 
             # Jump to page
             elif action.lower().startswith('p'):
@@ -583,7 +902,12 @@ if __name__ == '__main__':
                     else:
                         project: Project = page[1].projects[project_index]
                         print('Getting versions...')
-                        versions_results: VersionsSearchResults | SearchResultsError = get_versions(project)
+                        versions_future: Future[VersionsSearchResults | SearchResultsError] | None = page[1].prefetched_versions.pop(project.project_id, None)
+                        versions_results: VersionsSearchResults | SearchResultsError | None = None
+                        if versions_future is not None:
+                            versions_results = versions_future.result()
+                        if not isinstance(versions_results, VersionsSearchResults): # not prefetched, or the prefetch failed
+                            versions_results = get_versions(project)
                         if isinstance(versions_results, VersionsSearchResults):
                             page = ['project', project, versions_results, page[1]]
                         else:
@@ -627,7 +951,7 @@ if __name__ == '__main__':
                         action_is_quick_download = False
                         break
                     version_filter = word.lower()[1:]
-                elif word.lower() in LOADERS:
+                elif word.lower() in LOADERS_SET:
                     if loader_filter is not None:
                         action_is_quick_download = False
                         break
@@ -661,24 +985,11 @@ if __name__ == '__main__':
 
             # Quick-download version
             elif action_is_quick_download:
-                match: Version | None = None
-                for version in page[2].versions:
-                    matches_version: bool = True
-                    matches_loader: bool = True
-                    # Check if MC version filter matches
-                    if version_filter is not None:
-                        if version_filter not in version.mc_versions:
-                            matches_version = False
-                    # Check if loader filter matches
-                    if loader_filter is not None:
-                        if loader_filter not in version.loaders:
-                            matches_loader = False
-                    # Choose this version if both filters match and an equal or higher level has not already been found
-                    if matches_version and matches_loader:
-                        if match is None:
-                            match = version
-                        elif version.version_level > match.version_level:
-                            match = version
+                # Choose the first (newest) version with the highest level out of the versions that match both filters
+                matching_versions: Iterator[Version] = (version for version in page[2].versions
+                                                        if (version_filter is None or version_filter in version.mc_versions)
+                                                        and (loader_filter is None or loader_filter in version.loaders))
+                match: Version | None = max(matching_versions, key=lambda version: version.version_level, default=None)
                 if match is None:
                     page = ['message', f'No versions matching "{action}" were found.', page]
                 else:
@@ -758,16 +1069,7 @@ if __name__ == '__main__':
                     os.makedirs(directory, exist_ok=True)
                     local_filename: str = os.path.join(directory, page[1].primary_file.filename)
                     print('Downloading... ', end='\r')
-                    loading_animation_frame: int = 0
-                    downloaded_bytes: int = 0
-                    with requests.get(page[1].primary_file.url, stream=True) as r:
-                        r.raise_for_status()
-                        with open(local_filename, 'wb') as f:
-                            for chunk in r.iter_content(chunk_size=8192):
-                                print(f'Downloading... {LOADING_ANIMATION[loading_animation_frame]} {format_file_size(downloaded_bytes)}/{format_file_size(page[1].primary_file.size)}     ', end='\r')
-                                f.write(chunk)
-                                downloaded_bytes += 8192
-                                loading_animation_frame = (loading_animation_frame + 1) % len(LOADING_ANIMATION)
+                    download_files([page[1].primary_file], directory)
                     print('Downloading... done                                        ')
                     print(f'Saved to "{local_filename}".')
                     print('')
@@ -784,18 +1086,7 @@ if __name__ == '__main__':
                 try:
                     os.makedirs(directory, exist_ok=True)
                     print('Downloading... ', end='\r')
-                    loading_animation_frame: int = 0
-                    downloaded_bytes: int = 0
-                    for file in page[1].files:
-                        local_filename: str = os.path.join(directory, file.filename)
-                        with requests.get(page[1].primary_file.url, stream=True) as r:
-                            r.raise_for_status()
-                            with open(local_filename, 'wb') as f:
-                                for chunk in r.iter_content(chunk_size=8192):
-                                    print(f'Downloading... {LOADING_ANIMATION[loading_animation_frame]} {format_file_size(downloaded_bytes)}/{format_file_size(total_size)}     ', end='\r')
-                                    f.write(chunk)
-                                    downloaded_bytes += 8192
-                                    loading_animation_frame = (loading_animation_frame + 1) % len(LOADING_ANIMATION)
+                    download_files(page[1].files, directory)
                     print('Downloading... done                                        ')
                     print(f'Saved files to "{directory}".')
                     print('')
@@ -813,12 +1104,17 @@ if __name__ == '__main__':
         # Quit
         else:
             print('Goodbye')
+            EXECUTOR.shutdown(wait=False, cancel_futures=True)
             sys.exit()
 
         # Perform search
         if new_search is not None:
             print('Searching...')
-            results: SearchResults | SearchResultsError = search(*new_search)
+            results: SearchResults | SearchResultsError | None = None
+            if new_search_future is not None:
+                results = new_search_future.result()
+            if not isinstance(results, SearchResults): # not prefetched, or the prefetch failed
+                results = search(*new_search)
             if isinstance(results, SearchResults):
                 page = ['results', results]
             else: